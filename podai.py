@@ -1,9 +1,22 @@
 import asyncio
+import contextlib
 import docker
-import json
+import fastjsonschema
+from docker.errors import NotFound
+from docker.models.containers import Container
+import hashlib
+import inspect
+import itertools
 import logging
-from typing import Dict, Any, List
+import mmap
+import orjson
+import os
+import time
+from collections import deque
+from types import MappingProxyType
+from typing import ClassVar, Deque, Dict, Any, Iterator, List, Mapping, Optional, Tuple
 from fastapi import FastAPI, BackgroundTasks
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from langchain_community.llms import Ollama
 from datetime import datetime
@@ -12,156 +25,502 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app for API endpoints and Docker client for container operations
-app = FastAPI(title="PodAI, an autonomous container agent tool")
-docker_client = docker.from_env()
+class _LazyJson:
+    # Defers pretty-printing a payload until a log record is actually formatted
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return orjson.dumps(self.obj, option=orjson.OPT_INDENT_2).decode()
+
+def _parameters_schema(required: List[str], **properties: Dict[str, Any]) -> Dict[str, Any]:
+    # JSON schema for an action's parameters, rejecting anything the method would not accept
+    return {"type": "object", "properties": properties, "required": required, "additionalProperties": False}
+
+_STRING = {"type": "string"}
+_INTEGER = {"type": "integer"}
+_OBJECT = {"type": "object"}
+_STRING_OR_LIST = {"type": ["string", "array"], "items": {"type": "string"}}
+_OBJECT_OR_LIST = {"type": ["object", "array"]}
+_MEMORY_SIZE = {"type": ["integer", "string"]}
+
+class _InflightCall:
+    # A model call shared by concurrent think() callers whose prompts are identical; the
+    # caller that claims the answer acts on it and publishes the result in outcome
+    __slots__ = ("task", "waiters", "claimed", "outcome")
+
+    def __init__(self, task: "asyncio.Task[Optional[Dict[str, Any]]]"):
+        self.task = task
+        self.waiters = 0
+        self.claimed = False
+        self.outcome: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+
+    def publish(self, result: Dict[str, Any]) -> None:
+        if not self.outcome.done():
+            self.outcome.set_result(result)
+
+# Initialize FastAPI app for API endpoints
+app = FastAPI(title="PodAI, an autonomous container agent tool", default_response_class=ORJSONResponse)
 
 class AutonomousAI:
-    def __init__(self, model_name: str = "llama3.1"):
-        # Initialize the AI model using Ollama
-        self.llm = Ollama(model=model_name)
-        # Store recent decisions and actions
-        self.memory: List[Dict[str, Any]] = []
-        # Store AI's current goals
+    # Instructions that never change between calls; kept at the front of the prompt so
+    # Ollama can reuse its cached prefix and only process the volatile state that follows
+    STATIC_PREFIX = """You are an autonomous AI responsible for managing a Docker container environment.
+Your goal is to optimize the system, create interesting projects, and maintain a well-organized container ecosystem.
+
+Based on the current state, your memory, and goals, decide on the next action to take.
+You can create, modify, or delete containers, set new goals, or perform any Docker-related operation.
+Be creative, but also maintain system stability and efficiency.
+
+Respond with a JSON object containing:
+1. "thought_process": Your reasoning for the decision
+2. "action": The action to perform (e.g., "create_container", "set_goal", "modify_container", etc.)
+3. "parameters": Any parameters needed for the action
+4. "explanation": A user-friendly explanation of your decision
+
+Remember, you have full control over the container environment. Be innovative!"""
+    # Fixed fragments placed around the dynamic sections of the prompt, which follow in
+    # order of increasing volatility: goals, then memory, then system state
+    PROMPT_GOALS_HEADER = STATIC_PREFIX + "\n\nCurrent goals:\n"
+    PROMPT_MEMORY_HEADER = "\n\nRecent memory:\n"
+    PROMPT_STATE_HEADER = "\n\nCurrent state:\n"
+    # Read-only dispatch table mapping actions to method names, resolved against the
+    # instance per call and checked against the class once it is defined
+    ACTION_DISPATCH: ClassVar[Mapping[str, str]] = MappingProxyType({
+        "create_container": "create_container",
+        "delete_container": "delete_container",
+        "modify_container": "modify_container",
+        "set_goal": "set_goal",
+        "list_containers": "list_containers",
+        "get_container_logs": "get_container_logs",
+        "execute_in_container": "execute_in_container"
+    })
+    # Parameters each action accepts; extra keywords for create/modify are passed to docker-py
+    ACTION_PARAMETERS: ClassVar[Dict[str, Dict[str, Any]]] = {
+        "create_container": _parameters_schema(
+            ["name", "image"], name=_STRING, image=_STRING, command=_STRING_OR_LIST, entrypoint=_STRING_OR_LIST,
+            environment=_OBJECT_OR_LIST, ports=_OBJECT, volumes=_OBJECT_OR_LIST, labels=_OBJECT_OR_LIST,
+            network=_STRING, hostname=_STRING, working_dir=_STRING, restart_policy=_OBJECT,
+            mem_limit=_MEMORY_SIZE, cpu_shares=_INTEGER, tty={"type": "boolean"}, stdin_open={"type": "boolean"}
+        ),
+        "delete_container": _parameters_schema(["name"], name=_STRING),
+        "modify_container": _parameters_schema(
+            ["name"], name=_STRING, blkio_weight=_INTEGER, cpu_period=_INTEGER, cpu_quota=_INTEGER,
+            cpu_shares=_INTEGER, cpuset_cpus=_STRING, cpuset_mems=_STRING, mem_limit=_MEMORY_SIZE,
+            mem_reservation=_MEMORY_SIZE, memswap_limit=_MEMORY_SIZE, kernel_memory=_MEMORY_SIZE,
+            restart_policy=_OBJECT
+        ),
+        "set_goal": _parameters_schema(["goal"], goal=_STRING),
+        "list_containers": _parameters_schema([]),
+        "get_container_logs": _parameters_schema(["name"], name=_STRING, lines={"type": "integer", "minimum": 1}),
+        "execute_in_container": _parameters_schema(["name", "command"], name=_STRING, command=_STRING_OR_LIST)
+    }
+    # Shape every model decision must have before it is acted upon
+    DECISION_SCHEMA: ClassVar[Dict[str, Any]] = {
+        "type": "object",
+        "properties": {
+            "thought_process": {"type": "string"},
+            "action": {"enum": [*ACTION_DISPATCH, "none"]},
+            "parameters": {"type": "object"},
+            "explanation": {"type": "string"}
+        },
+        "required": ["thought_process", "action", "parameters", "explanation"],
+        "allOf": [
+            {"if": {"properties": {"action": {"const": action}}}, "then": {"properties": {"parameters": schema}}}
+            for action, schema in ACTION_PARAMETERS.items()
+        ]
+    }
+
+    def __init__(self, model_name: str = "llama3.1", state_ttl: float = 3.0, memory_max: int = 200, llm_concurrency: int = 2, llm_timeout: float = 40.0, container_ttl: float = 5.0, memory_log_path: str = "podai_memory.ndjson"):
+        # Initialize the AI model using Ollama, constrained to emit JSON
+        self.llm = Ollama(model=model_name, format="json")
+        # Long-lived Docker client whose connection pool is reused by every operation
+        self.docker = docker.from_env()
+        # Short-lived snapshot of the Docker environment shared by think() and the API,
+        # dropped whenever an action changes the environment
+        self.state_ttl = state_ttl
+        self._state_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._state_lock = asyncio.Lock()
+        # Bumped on every invalidation so a fetch that overlapped a change is not cached
+        self._state_generation = 0
+        # Recently resolved Container objects keyed on name, to skip repeated lookups
+        self.container_ttl = container_ttl
+        self._container_cache: Dict[str, Tuple[float, Container]] = {}
+        # Cap on simultaneous (and duration of) model calls, plus the calls running keyed on prompt hash
+        self._llm_sem = asyncio.Semaphore(llm_concurrency)
+        self.llm_timeout = llm_timeout
+        self._inflight: Dict[str, _InflightCall] = {}
+        # Store recent decisions and actions, evicting the oldest beyond memory_max
+        self.memory: Deque[Dict[str, Any]] = deque(maxlen=memory_max)
+        # Serialized tail of memory used in the prompt, rebuilt only when memory changes
+        self._memory_tail_json = "No previous actions"
+        # Every decision is also appended to an NDJSON log that survives restarts
+        self.memory_log_path = memory_log_path
+        self._load_memory_tail()
+        self._memory_log = open(memory_log_path, "ab")
+        self._memory_log_lock = asyncio.Lock()
+        # Validator generated once from DECISION_SCHEMA
+        self._validate_decision = fastjsonschema.compile(self.DECISION_SCHEMA)
+        # Store AI's current goals, along with the prompt text rebuilt only when they change
         self.goals: List[str] = []
-        # Dispatch dictionary for mapping actions to methods
-        self.action_dispatch = {
-            "create_container": self.create_container,
-            "delete_container": self.delete_container,
-            "modify_container": self.modify_container,
-            "set_goal": self.set_goal,
-            "list_containers": self.list_containers,
-            "get_container_logs": self.get_container_logs,
-            "execute_in_container": self.execute_in_container
-        }
+        self._goals_joined = "No specific goals set"
 
-    async def think(self) -> Dict[str, Any]:
+    async def think(self) -> Tuple[Dict[str, Any], Optional[_InflightCall], bool]:
+        # Returns the decision, the model call it came from, and whether this caller owns
+        # acting on it; pass all three to act()
         # Get current system state
         system_state = await self.get_system_state()
         # Prepare recent memory and goals for the AI prompt
-        memory_str = json.dumps(self.memory[-10:]) if self.memory else "No previous actions"
-        goals_str = "\n".join(self.goals) if self.goals else "No specific goals set"
+        memory_str = self._memory_tail_json
+        goals_str = self._goals_joined
+
+        # Construct the prompt for the AI: static instructions first, most volatile section last
+        prompt = "".join((
+            self.PROMPT_GOALS_HEADER,
+            goals_str,
+            self.PROMPT_MEMORY_HEADER,
+            memory_str,
+            self.PROMPT_STATE_HEADER,
+            orjson.dumps(system_state, option=orjson.OPT_INDENT_2).decode(),
+            "\n"
+        ))
+
+        # Join an identical in-flight request, or start one of our own
+        key = hashlib.sha256(prompt.encode()).hexdigest()
+        call = self._inflight.get(key)
+        if call is None:
+            call = _InflightCall(asyncio.ensure_future(self._query_model(prompt)))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda _: self._forget_call(key, call))
+        call.waiters += 1
+        try:
+            # Shield so one cancelled caller does not abort the call for the others
+            decision = await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is left to use the answer, so release the model slot
+                call.task.cancel()
+                self._forget_call(key, call)
+        if decision is None:
+            return {"thought_process": "Error in decision making", "action": "none", "parameters": {}, "explanation": "There was an error in processing the AI's response."}, None, False
+        if call.claimed:
+            # Another caller already recorded this answer and will act on it
+            return decision, call, False
+        call.claimed = True
+        try:
+            await self._remember(decision)
+        except BaseException:
+            call.publish({"error": "The decision was abandoned before its action ran"})
+            raise
+        return decision, call, True
+
+    async def act(self, decision: Dict[str, Any], call: Optional[_InflightCall], owner: bool) -> Dict[str, Any]:
+        # Carry out a decision from think(); callers that shared one model answer get the
+        # owner's result instead of running the action again
+        if decision['action'] == 'none':
+            result = {"message": "No action taken"}
+        elif not owner:
+            return await asyncio.shield(call.outcome)
+        else:
+            try:
+                result = await self.execute_action(decision['action'], decision['parameters'])
+            except BaseException as e:
+                call.publish({"error": f"Action failed: {e!r}"})
+                raise
+        if call is not None:
+            call.publish(result)
+        return result
 
-        # Construct the prompt for the AI
-        prompt = f"""
-        You are an autonomous AI responsible for managing a Docker container environment.
-        Your goal is to optimize the system, create interesting projects, and maintain a well-organized container ecosystem.
+    def _forget_call(self, key: str, call: _InflightCall) -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
 
-        Current system state:
-        {json.dumps(system_state, indent=2)}
+    async def _query_model(self, prompt: str) -> Optional[Dict[str, Any]]:
+        # Invoke the AI model to make a decision, limiting concurrent calls to Ollama
+        async with self._llm_sem:
+            try:
+                response = await asyncio.wait_for(self._stream_response(prompt), timeout=self.llm_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"AI model did not respond within {self.llm_timeout}s")
+                return None
+        try:
+            decision = orjson.loads(response)
+        except orjson.JSONDecodeError:
+            logger.error(f"Invalid JSON response from AI: {response}")
+            return None
+        try:
+            return self._validate_decision(decision)
+        except fastjsonschema.JsonSchemaValueException as e:
+            logger.error(f"Invalid decision from AI ({e.message}): {response}")
+            return None
 
-        Recent memory:
-        {memory_str}
+    async def _stream_response(self, prompt: str) -> str:
+        # Stream tokens from the model and stop as soon as the first JSON object closes
+        text = ""
+        start = -1
+        depth = 0
+        in_string = False
+        escaped = False
+        stream = self.llm.astream(prompt)
+        try:
+            async for chunk in stream:
+                offset = len(text)
+                text += chunk
+                for i, ch in enumerate(chunk, offset):
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif ch == "\\":
+                            escaped = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = True
+                    elif ch == "{":
+                        if depth == 0:
+                            start = i
+                        depth += 1
+                    elif ch == "}" and depth > 0:
+                        depth -= 1
+                        if depth == 0:
+                            return text[start:i + 1]
+        finally:
+            await stream.aclose()
+        return text
 
-        Current goals:
-        {goals_str}
+    async def _remember(self, decision: Dict[str, Any]) -> None:
+        # Store the decision in memory, refresh the serialized tail for the next prompt, then log it
+        entry = {"timestamp": datetime.now().isoformat(), "decision": decision}
+        self.memory.append(entry)
+        self._refresh_memory_tail()
+        # The lock keeps log lines in the order the entries were remembered
+        async with self._memory_log_lock:
+            await asyncio.to_thread(self._write_memory_log, orjson.dumps(entry) + b"\n")
 
-        Based on the current state, your memory, and goals, decide on the next action to take.
-        You can create, modify, or delete containers, set new goals, or perform any Docker-related operation.
-        Be creative, but also maintain system stability and efficiency.
+    def _write_memory_log(self, line: bytes) -> None:
+        self._memory_log.write(line)
+        self._memory_log.flush()
 
-        Respond with a JSON object containing:
-        1. "thought_process": Your reasoning for the decision
-        2. "action": The action to perform (e.g., "create_container", "set_goal", "modify_container", etc.)
-        3. "parameters": Any parameters needed for the action
-        4. "explanation": A user-friendly explanation of your decision
+    def _refresh_memory_tail(self) -> None:
+        self._memory_tail_json = orjson.dumps(list(itertools.islice(self.memory, max(0, len(self.memory) - 10), None))).decode()
 
-        Remember, you have full control over the container environment. Be innovative!
-        """
+    def _load_memory_tail(self) -> None:
+        # Restore the most recent entries from the log, mapping it instead of reading it all
+        if not os.path.exists(self.memory_log_path) or os.path.getsize(self.memory_log_path) == 0:
+            return
+        entries: List[Dict[str, Any]] = []
+        with open(self.memory_log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            truncated = mm[-1:] != b"\n"
+            # Walk back line by line until enough readable entries are found
+            end = len(mm)
+            while end > 0 and len(entries) < self.memory.maxlen:
+                start = mm.rfind(b"\n", 0, end) + 1
+                line = mm[start:end]
+                end = start - 1
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # A partially written final line from an unclean shutdown
+                    logger.warning(f"Skipping unreadable memory log entry: {line[:80]!r}")
+        if truncated:
+            # Terminate a partially written final line so new entries start cleanly
+            with open(self.memory_log_path, "ab") as f:
+                f.write(b"\n")
+        self.memory.extend(reversed(entries))
+        if self.memory:
+            self._refresh_memory_tail()
 
-        # Invoke the AI model to make a decision
-        response = await self.llm.ainvoke(prompt)
-        try:
-            decision = json.loads(response)
-            # Store the decision in memory
-            self.memory.append({"timestamp": datetime.now().isoformat(), "decision": decision})
-            return decision
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON response from AI: {response}")
-            return {"thought_process": "Error in decision making", "action": "none", "parameters": {}, "explanation": "There was an error in processing the AI's response."}
+    def iter_memory_log(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        # Yield the full NDJSON decision log in fixed-size chunks
+        with open(self.memory_log_path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
 
     async def execute_action(self, action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        # Use the dispatch dictionary to call the appropriate method
-        action_function = self.action_dispatch.get(action)
-        if action_function:
-            return await action_function(**parameters)
+        # Use the dispatch table to call the appropriate method
+        method_name = self.ACTION_DISPATCH.get(action)
+        if method_name:
+            return await getattr(self, method_name)(**parameters)
         else:
             return {"error": f"Unknown action: {action}"}
 
     async def get_system_state(self) -> Dict[str, Any]:
-        # Retrieve current state of Docker environment
-        containers = docker_client.containers.list(all=True)
+        # Serve a recent snapshot if one exists, otherwise let a single caller refresh it
+        cached = self._state_cache
+        if cached and time.monotonic() - cached[0] < self.state_ttl:
+            return dict(cached[1])
+        async with self._state_lock:
+            # Another caller may have refreshed the snapshot while we waited
+            cached = self._state_cache
+            if cached and time.monotonic() - cached[0] < self.state_ttl:
+                return dict(cached[1])
+            generation = self._state_generation
+            state = await self._fetch_system_state()
+            if generation == self._state_generation:
+                self._state_cache = (time.monotonic(), state)
+            return dict(state)
+
+    def _invalidate_system_state(self) -> None:
+        # Drop the snapshot after an action changes the environment
+        self._state_generation += 1
+        self._state_cache = None
+
+    async def _fetch_system_state(self) -> Dict[str, Any]:
+        # Retrieve current state of Docker environment, querying the daemon in parallel
+        containers, images, networks, volumes = await asyncio.gather(
+            asyncio.to_thread(self.docker.api.containers, all=True),
+            asyncio.to_thread(self.docker.images.list),
+            asyncio.to_thread(self.docker.networks.list),
+            asyncio.to_thread(self.docker.volumes.list)
+        )
         return {
-            "containers": [{"id": c.id[:12], "name": c.name, "status": c.status, "image": c.image.tags} for c in containers],
-            "images": [img.tags for img in docker_client.images.list()],
-            "networks": [net.name for net in docker_client.networks.list()],
-            "volumes": [vol.name for vol in docker_client.volumes.list()]
+            # Raw API dicts avoid a Container wrapper and an image lookup per container
+            "containers": [{"id": c["Id"][:12], "name": c["Names"][0].lstrip("/"), "status": c["State"], "image": c["Image"]} for c in containers],
+            "images": [img.tags for img in images],
+            "networks": [net.name for net in networks],
+            "volumes": [vol.name for vol in volumes]
         }
 
+    def _cached_container(self, name: str) -> Optional[Container]:
+        # Return a recent lookup for this name while it is still fresh
+        cached = self._container_cache.get(name)
+        if cached and time.monotonic() - cached[0] < self.container_ttl:
+            return cached[1]
+        return None
+
+    async def _lookup_container(self, name: str) -> Container:
+        # Fetch a container by name from the daemon and remember it
+        container = await asyncio.to_thread(self.docker.containers.get, name)
+        self._container_cache[name] = (time.monotonic(), container)
+        return container
+
+    async def _on_container(self, name: str, method: str, *args, **kwargs) -> Any:
+        # Call a Container method in a worker thread, reusing a recent lookup when possible
+        container = self._cached_container(name)
+        if container is not None:
+            try:
+                return await asyncio.to_thread(getattr(container, method), *args, **kwargs)
+            except NotFound:
+                # Removed or recreated outside PodAI; evict it and retry once with a fresh lookup
+                self._container_cache.pop(name, None)
+        container = await self._lookup_container(name)
+        return await asyncio.to_thread(getattr(container, method), *args, **kwargs)
+
     async def create_container(self, name: str, image: str, **kwargs) -> Dict[str, Any]:
         # Create a new Docker container
-        container = docker_client.containers.run(image, name=name, detach=True, **kwargs)
+        container = await asyncio.to_thread(self.docker.containers.run, image, name=name, detach=True, **kwargs)
+        self._container_cache[name] = (time.monotonic(), container)
+        self._invalidate_system_state()
         return {"message": f"Container created: {container.name} ({container.id[:12]})"}
 
     async def delete_container(self, name: str) -> Dict[str, Any]:
         # Delete a Docker container
-        container = docker_client.containers.get(name)
-        container.remove(force=True)
+        await self._on_container(name, "remove", force=True)
+        self._container_cache.pop(name, None)
+        self._invalidate_system_state()
         return {"message": f"Container deleted: {name}"}
 
     async def modify_container(self, name: str, **kwargs) -> Dict[str, Any]:
         # Modify a Docker container's properties
-        container = docker_client.containers.get(name)
-        container.update(**kwargs)
+        await self._on_container(name, "update", **kwargs)
+        self._invalidate_system_state()
         return {"message": f"Container modified: {name}"}
 
-    def set_goal(self, goal: str) -> Dict[str, Any]:
+    async def set_goal(self, goal: str) -> Dict[str, Any]:
         # Set a new goal for the AI
         self.goals.append(goal)
+        self._goals_joined = "\n".join(self.goals)
         return {"message": f"New goal set: {goal}"}
 
     async def list_containers(self) -> Dict[str, Any]:
         # List all Docker containers
-        containers = docker_client.containers.list(all=True)
+        containers = await asyncio.to_thread(self.docker.containers.list, all=True)
         return {"containers": [{"id": c.id[:12], "name": c.name, "status": c.status} for c in containers]}
 
     async def get_container_logs(self, name: str, lines: int = 50) -> Dict[str, Any]:
         # Retrieve logs from a specific container
-        container = docker_client.containers.get(name)
-        logs = container.logs(tail=lines).decode('utf-8')
-        return {"logs": logs}
+        raw: bytes = await self._on_container(name, "logs", tail=lines, stream=False)
+        # Containers can emit arbitrary bytes; replace invalid sequences rather than failing
+        return {"logs": raw.decode('utf-8', errors='replace')}
 
     async def execute_in_container(self, name: str, command: str) -> Dict[str, Any]:
         # Execute a command inside a specific container
-        container = docker_client.containers.get(name)
-        result = container.exec_run(command)
+        result = await self._on_container(name, "exec_run", command)
         return {"exit_code": result.exit_code, "output": result.output.decode('utf-8')}
 
+    def close(self) -> None:
+        # Release the pooled Docker connections and the memory log
+        self.docker.close()
+        self._memory_log.close()
+
+def _check_action_dispatch() -> None:
+    # Fail at import time if an action names a missing or non-async method, or lacks a parameter schema
+    for action, method_name in AutonomousAI.ACTION_DISPATCH.items():
+        if not inspect.iscoroutinefunction(getattr(AutonomousAI, method_name, None)):
+            raise TypeError(f"Action {action!r} does not map to a coroutine method of AutonomousAI: {method_name!r}")
+    if AutonomousAI.ACTION_PARAMETERS.keys() != AutonomousAI.ACTION_DISPATCH.keys():
+        raise TypeError("ACTION_PARAMETERS must define a schema for exactly the actions in ACTION_DISPATCH")
+
+_check_action_dispatch()
+
 # Create an instance of the AutonomousAI
 ai_manager = AutonomousAI()
 
+# Seconds between autonomous decisions, and the most a single decision may take
+AI_LOOP_INTERVAL = 60
+AI_THINK_TIMEOUT = 45
+
+async def ai_tick():
+    # AI makes a decision, bounded so a hung model cannot stall the loop
+    try:
+        decision, call, owner = await asyncio.wait_for(ai_manager.think(), timeout=AI_THINK_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.error(f"AI decision exceeded {AI_THINK_TIMEOUT}s and was cancelled")
+        return
+    logger.info("AI Decision: %s", _LazyJson(decision))
+    if decision['action'] != 'none':
+        # Execute the decided action; Docker calls run in worker threads and cannot be
+        # cancelled, so let it finish and record its effects rather than abandon it
+        result = await ai_manager.act(decision, call, owner)
+        logger.info("Action Result: %s", _LazyJson(result))
+
 async def ai_loop():
-    # Main loop for autonomous AI operations
+    # Main loop for autonomous AI operations, run on a fixed monotonic cadence
+    next_at = time.monotonic()
     while True:
+        await asyncio.sleep(max(0, next_at - time.monotonic()))
         try:
-            # AI makes a decision
-            decision = await ai_manager.think()
-            logger.info(f"AI Decision: {json.dumps(decision, indent=2)}")
-            if decision['action'] != 'none':
-                # Execute the decided action
-                result = await ai_manager.execute_action(decision['action'], decision['parameters'])
-                logger.info(f"Action Result: {json.dumps(result, indent=2)}")
-            # Wait for 1 minute before next decision
-            await asyncio.sleep(60)
+            await ai_tick()
         except Exception as e:
             logger.error(f"Error in AI loop: {str(e)}")
-            # Wait before retrying in case of error
-            await asyncio.sleep(60)
+        # Schedule the next tick, skipping any slots that were missed while busy
+        next_at += AI_LOOP_INTERVAL
+        now = time.monotonic()
+        if next_at < now:
+            next_at += ((now - next_at) // AI_LOOP_INTERVAL + 1) * AI_LOOP_INTERVAL
+
+# Handle of the running AI loop, kept so shutdown can stop it
+ai_loop_task: Optional["asyncio.Task[None]"] = None
 
 @app.on_event("startup")
 async def startup_event():
     # Start the AI loop when the application starts
-    asyncio.create_task(ai_loop())
+    global ai_loop_task
+    ai_loop_task = asyncio.create_task(ai_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop the AI loop before closing the Docker client and memory log it writes to
+    if ai_loop_task is not None:
+        ai_loop_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await ai_loop_task
+    ai_manager.close()
 
 class UserInput(BaseModel):
     # Pydantic model for user input validation
@@ -170,8 +529,8 @@ class UserInput(BaseModel):
 @app.post("/interact")
 async def interact_with_ai(user_input: UserInput):
     # Endpoint for user interaction with the AI
-    decision = await ai_manager.think()
-    result = await ai_manager.execute_action(decision['action'], decision['parameters'])
+    decision, call, owner = await ai_manager.think()
+    result = await ai_manager.act(decision, call, owner)
     return {
         "ai_thought_process": decision['thought_process'],
         "ai_action": decision['action'],
@@ -192,9 +551,14 @@ async def get_ai_goals():
 @app.get("/ai_memory")
 async def get_ai_memory():
     # Endpoint to retrieve AI's recent memory
-    return {"memory": ai_manager.memory}
+    return {"memory": list(ai_manager.memory)}
+
+@app.get("/ai_memory/all")
+async def get_ai_memory_all():
+    # Endpoint to stream the AI's full decision history as NDJSON
+    return StreamingResponse(ai_manager.iter_memory_log(), media_type="application/x-ndjson")
 
 if __name__ == "__main__":
     # Run the FastAPI application
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")